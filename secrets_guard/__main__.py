@@ -1,22 +1,26 @@
 import argparse
 import datetime
+import os
 import re
 import sys
 import json
 from getpass import getpass
 from pathlib import Path
 
-from secrets_guard.git import git_pull, git_push
-from secrets_guard.keyring import keyring_get_key, keyring_put_key
-from secrets_guard.store import Store, FIELD_ADDED, FIELD_MODIFIED
+# Heavy modules (git, keyring, store -> Cryptodome) are imported lazily
+# inside the commands that need them, in order to keep startup fast
+# (e.g. for --help).
 
 SECRETS_PATH = Path.home() / ".secrets"
+STORE_EXTENSION = ".sec"
 FIELD_ATTRIBUTE_HIDDEN = "h"
 FIELD_ATTRIBUTE_MANDATORY = "m"
 
 COLOR_RESET = "\33[0m"
 COLOR_RED = "\33[31m"
 
+ANSI_ESCAPE_REGEX = re.compile("\x1B\\[[0-9]+m")
+
 def abort(*args, **kwargs):
     print(*args, **kwargs, file=sys.stderr)
     exit(1)
@@ -34,8 +38,10 @@ def prompt(message, secure=False, double_check_message=None):
             return p1
 
 def numerate(data, enum_field="ID"):
-    for i, d in enumerate(data):
-        d[enum_field] = i
+    """
+    Returns copies of the given dicts, numbered by their position.
+    """
+    return [{**d, enum_field: i} for i, d in enumerate(data)]
 
 def sort(data, sort_field, reverse):
     field_type = None
@@ -59,112 +65,101 @@ def sort(data, sort_field, reverse):
 
     return sorted(data, key=cmp, reverse=reverse)
 
-def tabulate(headers, data):
-    ANSI_ESCAPE_REGEX = re.compile("\x1B\\[[0-9]+m")
+def escaped_text_length(text):
+    """
+    Returns the length of the text without the '\33[??m' ANSI codes.
+    """
+    # Most cells are not highlighted: skip the regex
+    if "\x1b" not in text:
+        return len(text)
 
-    def escaped_text_length(text):
-        # Remove '\33[??m' codes from text
-        ansi_colors = ANSI_ESCAPE_REGEX.findall(text)
-        ansi_colors_len = 0
-        if ansi_colors and len(ansi_colors) > 0:
-            ansi_colors_len = sum([len(c) for c in ansi_colors])
-        return len(text) - ansi_colors_len
+    return len(ANSI_ESCAPE_REGEX.sub("", text))
 
+def tabulate(headers, data):
     HALF_PADDING = 1
     PADDING = 2 * HALF_PADDING
 
-    out = ""
-
-    max_lengths = {}
-
-    # Compute max length for each field
-    for h in headers:
-        m = len(h)
-        for d in data:
-            if h in d:
-                m = max(m, escaped_text_length(str(d[h])))
-        max_lengths[h] = m
-
-    def separator_row(first=False, last=False):
-        s = "┌" if first else ("└" if last else "├")
-
-        for hh_i, hh in enumerate(headers):
-            s += ("─" * (max_lengths[hh] + PADDING))
-            if hh_i < len(headers) - 1:
-                 s += "┬" if first else ("┴" if last else "┼")
-
-        s += "┐" if first else ("┘" if last else "┤")
-
-        if not last:
-            s += "\n"
-
-        return s
-
-    def data_cell(filler):
-        return (" " * HALF_PADDING) + filler() + (" " * HALF_PADDING)
-
-    def data_cell_filler(text, fixed_length):
-        # Consider ANSI color before pad
-        return text.ljust(fixed_length + (len(text) - escaped_text_length(text)))
-
-    # Row
-    out += separator_row(first=True)
-
-    # Headers
-    for h in headers:
-        out += "│" + data_cell(lambda: data_cell_filler(h, max_lengths[h]))
-    out += "│\n"
-
-    # Row
-    out += separator_row()
-
-    # Data
+    # Compute the text and the visible length of each cell only once
+    rows = []
     for d in data:
-        for dh in headers:
-            out += "│" + data_cell(
-                lambda: data_cell_filler((str(d[dh]) if dh in d else " "), max_lengths[dh])
-            )
-        out += "│\n"
+        row = []
+        for h in headers:
+            text = str(d[h]) if h in d else " "
+            row.append((text, escaped_text_length(text)))
+        rows.append(row)
 
-    # Row
-    out += separator_row(last=True)
-
-    return out
+    # Compute max length for each field
+    max_lengths = {}
+    for h_i, h in enumerate(headers):
+        max_lengths[h] = max([len(h)] + [row[h_i][1] for row in rows])
+
+    def separator_row(left, middle, right):
+        return left + middle.join("─" * (max_lengths[h] + PADDING) for h in headers) + right
+
+    def data_row(cells):
+        # Pad by the visible length (ANSI colors excluded)
+        return "│" + "│".join(
+            " " * HALF_PADDING + text + " " * (max_lengths[h] - text_length + HALF_PADDING)
+            for (text, text_length), h in zip(cells, headers)
+        ) + "│"
+
+    # Build the lines and join them once at the end
+    lines = [
+        separator_row("┌", "┬", "┐"),
+        data_row([(h, len(h)) for h in headers]),
+        separator_row("├", "┼", "┤")
+    ]
+    lines += [data_row(row) for row in rows]
+    lines.append(separator_row("└", "┴", "┘"))
+
+    return "\n".join(lines)
+
+def keyval_list_to_dict(keyvals):
+    """
+    Converts a list of '<key>=<value>' strings to a dict,
+    skipping the ones without '='.
+    """
+    d = {}
+    for kv in keyvals:
+        k, sep, v = kv.partition("=")
+        if sep:
+            d[k] = v
+    return d
 
 def highlight(text, spans, color=COLOR_RED):
     """
     Highlights the text by insert the given ANSi color (default: red).
     """
 
-    def insert_into(source, insert, pos):
-        return source[:pos] + insert + source[pos:]
-
-    spans = sorted(spans, key=lambda s: s[0], reverse=True)
+    # Build the result in a single pass instead of re-slicing it per span
+    parts = []
+    last_pos = 0
+    for (startpos, endpos) in sorted(spans, key=lambda s: s[0]):
+        parts += [text[last_pos:startpos], color, text[startpos:endpos], COLOR_RESET]
+        last_pos = endpos
+    parts.append(text[last_pos:])
 
-    highlighted_text = text
-    for (startpos, endpos) in spans:
-        highlighted_text = insert_into(highlighted_text, COLOR_RESET, endpos)
-        highlighted_text = insert_into(highlighted_text, color, startpos)
-
-    return highlighted_text
+    return "".join(parts)
 
 def get_stores_path(args, require_exist=True):
-    p = Path(args["path"] or SECRETS_PATH)
+    p = Path(args.path or SECRETS_PATH)
     if require_exist and not p.exists():
         abort(f"ERROR: secrets path does not exist ({p})")
     return p
 
 
 def get_or_prompt(args, key, message, secure=False, double_check_message=None):
-    v = args.get(key)
+    v = getattr(args, key, None)
     if v:
         return v
 
     return prompt(message, secure=secure, double_check_message=double_check_message)
 
 def get_store_key(args, store_name):
+    from secrets_guard.keyring import keyring_get_key
+
     # check in arguments
-    key = args["key"]
+    key = args.key
     if key:
         return key
 
@@ -178,25 +173,36 @@ def get_store_key(args, store_name):
 
     return key
 
+def get_store_commons(args, require_key=True):
+    """
+    Returns the name, the path and the key (None if not required)
+    of the store the command refers to, prompting for the missing ones.
+    """
+    path = get_stores_path(args, require_exist=False)
+    name = get_or_prompt(args, "name", "Store name: ")
+    key = get_store_key(args, name) if require_key else None
+    return name, path / f"{name}{STORE_EXTENSION}", key
+
 def open_store(name, path, key):
+    from secrets_guard.keyring import keyring_put_key
+    from secrets_guard.store import Store
+
     # open
     store = Store(path, key)
     if not store.load():
         abort("ERROR: failed to load store")
 
     # save in keyring
-    keyring_put_key(name, key)
+    keyring_put_key(name, store.key)
 
     return store
 
 def command_create(args):
-    path = get_stores_path(args, require_exist=False)
-    name = get_or_prompt(args, "name", "Store name: ")
-    key = get_store_key(args, name)
+    from secrets_guard.store import Store
 
-    store_path = path / f"{name}.sec"
+    name, store_path, key = get_store_commons(args)
 
-    raw_fields = args["fields"]
+    raw_fields = args.fields
     if not raw_fields:
         raw_fields = []
         i = 1
@@ -216,9 +222,7 @@ def command_create(args):
 
     store = Store(store_path, key)
     for raw_field in raw_fields:
-        field_parts = raw_field.split("+")
-        field_name = field_parts[0]
-        field_modifiers = field_parts[1] if len(field_parts) > 1 else []
+        field_name, _, field_modifiers = raw_field.partition("+")
 
         store.add_field(field_name,
                         hidden=FIELD_ATTRIBUTE_HIDDEN in field_modifiers,
@@ -229,9 +233,9 @@ def command_create(args):
 
 
 def command_destroy(args):
-    path = get_stores_path(args, require_exist=False)
-    name = get_or_prompt(args, "name", "Store name: ")
-    store_path = path / f"{name}.sec"
+    from secrets_guard.store import Store
+
+    _, store_path, _ = get_store_commons(args, require_key=False)
 
     store = Store(store_path)
     ok = store.destroy()
@@ -242,25 +246,27 @@ def command_destroy(args):
 def command_list(args):
     path = get_stores_path(args, require_exist=False)
 
-    stores = sorted([
-        store_path.stem
-        for store_path in path.iterdir()
-        if store_path.suffix == ".sec"
-    ])
-
-    if args["json"]:
+    with os.scandir(path) as entries:
+        stores = sorted([
+            entry.name[:-len(STORE_EXTENSION)]
+            for entry in entries
+            # A bare '.sec' file has no name (like Path.suffix/stem)
+            if len(entry.name) > len(STORE_EXTENSION)
+            and entry.name.endswith(STORE_EXTENSION)
+            and entry.is_file()
+        ])
+
+    if args.json:
         print(json.dumps(stores))
-    else:
-        for s in stores:
-            print(s)
+    elif stores:
+        print("\n".join(stores))
 
 def _command_projection(args):
-    path = get_stores_path(args, require_exist=False)
-    name = get_or_prompt(args, "name", "Store name: ")
-    key = get_store_key(args, name)
-    store_path = path / f"{name}.sec"
+    from secrets_guard.store import FIELD_ADDED, FIELD_MODIFIED
 
-    fields = args["fields"]
+    name, store_path, key = get_store_commons(args)
+
+    fields = args.fields
 
     store = open_store(name, store_path, key)
 
@@ -268,17 +274,16 @@ def _command_projection(args):
         fields = [f["name"] for f in store.get_fields()]
     if "ID" not in fields:
         fields = ["ID"] + fields
-    if args["when"]:
+    if args.when:
         if FIELD_ADDED not in fields:
             fields += [FIELD_ADDED]
         if FIELD_MODIFIED not in fields:
             fields += [FIELD_MODIFIED]
 
-    secrets = store.get_secrets()
-    numerate(secrets, enum_field="ID")
+    secrets = numerate(store.get_secrets(), enum_field="ID")
 
-    if args["sort"]:
-        secrets = sort(secrets, args["sort"], reverse=args["reverse"])
+    if args.sort:
+        secrets = sort(secrets, args.sort, reverse=args.reverse)
 
     display_secrets = []
     for secret in secrets:
@@ -293,7 +298,7 @@ def _command_projection(args):
 def command_show(args):
     fields, display_secrets = _command_projection(args)
 
-    if args["json"]:
+    if args.json:
         print(json.dumps(display_secrets))
     else:
         print(tabulate(fields, display_secrets))
@@ -302,34 +307,39 @@ def command_grep(args):
     fields, projection_secrets = _command_projection(args)
     pattern = get_or_prompt(args, "pattern", "Search pattern: ")
 
+    # Compile once, instead of for each field of each secret
+    try:
+        regex = re.compile(pattern, re.IGNORECASE)
+    except re.error as e:
+        abort(f"ERROR: invalid search pattern ({e})")
+
     display_secrets = []
     for s in projection_secrets:
+        display_secret = {k: str(v) for k, v in s.items()}
+
+        if args.json:
+            # Nothing to highlight: stop at the first matching field
+            if any(regex.search(v) for v in display_secret.values()):
+                display_secrets.append(display_secret)
+            continue
+
         match = False
-        display_secret = {}
-        for k, v in s.items():
-            v_highlighted = str(v)
-            re_matches = list(re.finditer(pattern, v_highlighted, re.IGNORECASE))
-            if re_matches:
+        for k, v in display_secret.items():
+            spans = [re_match.span() for re_match in regex.finditer(v)]
+            if spans:
                 match = True
-                if not args["json"]:
-                    matches = [re_match.span() for re_match in re_matches]
-                    v_highlighted = highlight(v_highlighted, matches)
-
-            display_secret[k] = v_highlighted
+                display_secret[k] = highlight(v, spans)
         if match:
             display_secrets.append(display_secret)
 
-    if args["json"]:
+    if args.json:
         print(json.dumps(display_secrets))
     else:
         print(tabulate(fields, display_secrets))
 
 
 def command_clear(args):
-    path = get_stores_path(args, require_exist=False)
-    name = get_or_prompt(args, "name", "Store name: ")
-    key = get_store_key(args, name)
-    store_path = path / f"{name}.sec"
+    name, store_path, key = get_store_commons(args)
 
     store = open_store(name, store_path, key)
 
@@ -339,11 +349,9 @@ def command_clear(args):
         abort("ERROR: failed to save store")
 
 def command_change_key(args):
-    path = get_stores_path(args, require_exist=False)
-    name = get_or_prompt(args, "name", "Store name: ")
+    name, store_path, _ = get_store_commons(args, require_key=False)
     key = get_or_prompt(args, "key", "Old store key: ", secure=True)
-    new_key = get_or_prompt(args, "new", "New store key: ", secure=True, double_check_message="New store key again: ")
-    store_path = path / f"{name}.sec"
+    new_key = get_or_prompt(args, "new_key", "New store key: ", secure=True, double_check_message="New store key again: ")
 
     store = open_store(name, store_path, key)
 
@@ -353,19 +361,10 @@ def command_change_key(args):
         abort("ERROR: failed to save store")
 
 def command_add(args):
-    path = get_stores_path(args, require_exist=False)
-    name = get_or_prompt(args, "name", "Store name: ")
-    key = get_store_key(args, name)
-    store_path = path / f"{name}.sec"
-    data = args["data"] or []
+    name, store_path, key = get_store_commons(args)
+    data = args.data or []
 
-    secret = {}
-    for d in data:
-        try:
-            key, value = d.split("=", maxsplit=1)
-            secret[key] = value
-        except:
-            pass
+    secret = keyval_list_to_dict(data)
 
     store = open_store(name, store_path, key)
 
@@ -388,25 +387,16 @@ def command_add(args):
         abort("ERROR: failed to save store")
 
 def command_modify(args):
-    path = get_stores_path(args, require_exist=False)
-    name = get_or_prompt(args, "name", "Store name: ")
-    key = get_store_key(args, name)
-    secret_id = get_or_prompt(args, "key", "ID of the secret to modify: ")
-    store_path = path / f"{name}.sec"
-    data = args["data"] or []
+    name, store_path, key = get_store_commons(args)
+    secret_id = get_or_prompt(args, "secret", "ID of the secret to modify: ")
+    data = args.data or []
 
     try:
         secret_id = int(secret_id)
     except ValueError:
         abort("ERROR: invalid secret format")
 
-    secret_mod = {}
-    for d in data:
-        try:
-            key, value = d.split("=", maxsplit=1)
-            secret_mod[key] = value
-        except:
-            pass
+    secret_mod = keyval_list_to_dict(data)
 
     store = open_store(name, store_path, key)
 
@@ -417,17 +407,21 @@ def command_modify(args):
 
         fields = store.get_fields()
 
+        # Build the menu once, it is shown again after each invalid choice
+        menu_lines = ["Select the field to modify:"]
+        for i, f in enumerate(fields):
+            value = secret.get(f["name"], "")
+            menu_lines.append(f"{i}. {f['name']} ({'*' * len(value) if f['hidden'] else value})")
+        menu = "\n".join(menu_lines)
+
         while True:
-            print("Select the field to modify:")
-            for i, f in enumerate(fields):
-                print(f"{i}. {f['name']} ({'*' * len(secret[f['name']]) if f['hidden'] else secret[f['name']]})")
-            choice = input()
+            print(menu)
             try:
-                choice = int(choice)
-                if 0 <= choice < len(fields):
-                    break
-            except:
-                pass
+                choice = int(input())
+            except ValueError:
+                continue
+            if 0 <= choice < len(fields):
+                break
 
         chosen_field = fields[choice]
         hidden = chosen_field["hidden"]
@@ -444,37 +438,38 @@ def command_modify(args):
 
 
 def command_remove(args):
-    path = get_stores_path(args, require_exist=False)
-    name = get_or_prompt(args, "name", "Store name: ")
-    key = get_store_key(args, name)
-    store_path = path / f"{name}.sec"
+    name, store_path, key = get_store_commons(args)
 
-    secrets_to_remove = args["secrets"]
+    secrets_to_remove = args.secrets
 
     store = open_store(name, store_path, key)
 
     if not secrets_to_remove:
         x = prompt("ID of the secret(s) to remove: ")
-        secrets_to_remove = x.split(" ")
+        secrets_to_remove = x.split()
 
     try:
-        secrets_to_remove = [int(s) for s in secrets_to_remove]
+        secrets_to_remove = {int(s) for s in secrets_to_remove}
     except ValueError:
         abort("ERROR: invalid secrets format")
 
-    for s in sorted(secrets_to_remove, reverse=True):
-        if not store.remove_secret(s):
-            print(f"ERROR: failed to remove secret {s}")
+    removed = store.remove_secrets(secrets_to_remove)
+    for s in sorted(secrets_to_remove - removed):
+        print(f"ERROR: failed to remove secret {s}")
 
     if not store.save():
         abort("ERROR: failed to save store")
 
 def command_push(args):
+    from secrets_guard.git import git_push
+
     path = get_stores_path(args, require_exist=False)
     if not git_push(path, commit_message="Committed on " + datetime.datetime.now().strftime("%H:%M:%S %d/%m/%Y")):
         abort("ERROR: failed to push")
 
 def command_pull(args):
+    from secrets_guard.git import git_pull
+
     path = get_stores_path(args, require_exist=False)
     if not git_pull(path):
         abort("ERROR: failed to pull")
@@ -823,7 +818,7 @@ def main():
     )
 
     args = parser.parse_args(sys.argv[1:])
-    args.func(args=vars(args))
+    args.func(args=args)
 
 if __name__ == '__main__':
     main()
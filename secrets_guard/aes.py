@@ -22,14 +22,17 @@ def aes_key(key: str | bytes):
     raise TypeError(f"Invalid key type: {type(key)}, expect str or bytes")
 
 
-def aes_encrypt(plaintext: str, iv: bytes, key: str | bytes):
+def aes_encrypt(plaintext: str | bytes, iv: bytes, key: str | bytes):
     """
-    Encrypts a text using the given IV and key
+    Encrypts a text (or its UTF-8 bytes) using the given IV and key
     (saving the IV at the beginning of the file).
     """
     key = aes_key(key)
 
-    padded_text = pad(bytes(plaintext, encoding="utf-8"), AES.block_size)
+    if isinstance(plaintext, str):
+        plaintext = plaintext.encode("utf-8")
+
+    padded_text = pad(plaintext, AES.block_size)
     cipher = AES.new(key, mode=AES.MODE_CBC, IV=iv)
     return base64.b64encode(iv + cipher.encrypt(padded_text))
 
@@ -41,7 +44,8 @@ def aes_decrypt(encrypted_content: bytes, key: str | bytes):
     """
     key = aes_key(key)
 
-    decoded_content = base64.b64decode(encrypted_content)
+    # Slice through a memoryview, so that the body is not copied
+    decoded_content = memoryview(base64.b64decode(encrypted_content))
     iv = decoded_content[:AES.block_size]
     body = decoded_content[AES.block_size:]
 
@@ -49,10 +53,10 @@ def aes_decrypt(encrypted_content: bytes, key: str | bytes):
     return unpad(cipher.decrypt(body), AES.block_size).decode("utf-8")
 
 
-def aes_encrypt_file(path: Path, key: str | bytes, content: str):
+def aes_encrypt_file(path: str | Path, key: str | bytes, content: str | bytes):
     """ Encrypts a file using AES (saving the IV at the beginning of the file). """
     try:
-        with path.open("wb") as f:
+        with open(path, "wb") as f:
             iv = Random.new().read(AES.block_size)
             encrypted_content = aes_encrypt(content, iv, aes_key(key))
             f.write(encrypted_content)
@@ -62,10 +66,10 @@ def aes_encrypt_file(path: Path, key: str | bytes, content: str):
         return False
 
 
-def aes_decrypt_file(path: Path, key: str | bytes):
+def aes_decrypt_file(path: str | Path, key: str | bytes):
     """ Decrypts a file using AES (looking for the IV at the beginning of the file). """
     try:
-        with path.open("rb") as file:
+        with open(path, "rb") as file:
             encrypted_content = file.read()
             plaintext = aes_decrypt(encrypted_content, aes_key(key))
             return plaintext
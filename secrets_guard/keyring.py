@@ -11,6 +11,10 @@ from secrets_guard.aes import aes_key
 # of the store in the system temporary folder (e.g. /tmp/password.key).
 # This guarantees that the keyring is freed-up on the next system boot.
 # The content of the file is actually the hashed key.
+# The keys read or written during the process are cached in memory, so that
+# the keyring file is accessed at most once per store.
+
+_keyring_cache = {}
 
 def _keyring_path(store_name):
     return Path(tempfile.gettempdir()) / (store_name + ".key")
@@ -19,9 +23,15 @@ def keyring_put_key(store_name, store_key):
     """
     Puts the given key (plain or already hashed) in the keyring.
     """
+    key = aes_key(store_key)
+    if _keyring_cache.get(store_name) == key:
+        return
+
     keyring_path = _keyring_path(store_name)
     with keyring_path.open("wb") as keyring:
-        keyring.write(aes_key(store_key))
+        keyring.write(key)
+
+    _keyring_cache[store_name] = key
 
 def keyring_has_key(store_name):
     """
@@ -33,16 +43,23 @@ def keyring_get_key(store_name):
     """
     Returns the key of the given name or None if it does not exist in the keyring.
     """
-    if not keyring_has_key(store_name):
+    key = _keyring_cache.get(store_name)
+    if key:
+        return key
+
+    try:
+        with _keyring_path(store_name).open("rb") as keyring:
+            key = keyring.read()
+    except OSError:
         return None
 
-    with _keyring_path(store_name).open("rb") as keyring:
-        return keyring.read()
+    _keyring_cache[store_name] = key
+    return key
 
 def keyring_del_key(store_name):
     """
     Delete the key associaited with the given store name from the keyring.
     """
-    keyring_path = _keyring_path(store_name)
-    if keyring_path.is_file():
-        keyring_path.unlink()
+    _keyring_cache.pop(store_name, None)
+
+    _keyring_path(store_name).unlink(missing_ok=True)
@@ -2,7 +2,41 @@ import json
 from datetime import datetime
 from pathlib import Path
 
-from secrets_guard.aes import aes_encrypt_file, aes_decrypt_file
+from secrets_guard.aes import aes_encrypt_file, aes_decrypt_file, aes_key
+
+def _json_dumps_stdlib(obj):
+    try:
+        # Compact and not ASCII-escaped: less plaintext to encrypt
+        return json.dumps(obj, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+    except UnicodeEncodeError:
+        # Lone surrogates (e.g. from undecodable input) are not valid UTF-8,
+        # keep them \u-escaped
+        return json.dumps(obj, separators=(",", ":")).encode("utf-8")
+
+# Use orjson for (de)serializing the store, if available
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+def json_loads(content):
+    if orjson:
+        try:
+            return orjson.loads(content)
+        except orjson.JSONDecodeError:
+            # orjson rejects valid JSON the stdlib accepts
+            # (e.g. \udcXX escapes of lone surrogates)
+            pass
+    return json.loads(content)
+
+def json_dumps(obj):
+    if orjson:
+        try:
+            return orjson.dumps(obj)
+        except orjson.JSONEncodeError:
+            # e.g. lone surrogates
+            pass
+    return _json_dumps_stdlib(obj)
 
 FIELD_ADDED = "Added"
 FIELD_MODIFIED = "Modified"
@@ -36,6 +70,17 @@ class Store:
             "model": [],
             "data": []
         }
+        # Secrets sorted by get_secrets(), reset whenever they change
+        self._sorted_secrets = None
+
+    @property
+    def key(self):
+        return self._key
+
+    @key.setter
+    def key(self, key):
+        # Hash a plain key once, instead of on each load/save
+        self._key = aes_key(key) if key is not None else None
 
     def load(self):
         result = aes_decrypt_file(self.path, self.key)
@@ -44,7 +89,8 @@ class Store:
             return False
 
         try:
-            self.content = json.loads(result)
+            self.content = json_loads(result)
+            self._sorted_secrets = None
             return True
         except ValueError:
             return False
@@ -52,22 +98,18 @@ class Store:
     def save(self):
         try:
             self.path.parent.mkdir(parents=True, exist_ok=True)
-        except OSError as e:
-            pass
-
-
-        write_ok = aes_encrypt_file(self.path, self.key,
-                                    json.dumps(self.content))
+        except OSError:
+            return False
 
-        return write_ok and self.path.exists()
+        return aes_encrypt_file(self.path, self.key, json_dumps(self.content))
 
     def destroy(self):
-        if not self.path.is_file():
+        try:
+            self.path.unlink()
+            return True
+        except OSError:
             return False
 
-        self.path.unlink()
-        return True
-
     def get_fields(self):
         return self.content["model"]
 
@@ -79,12 +121,14 @@ class Store:
         })
 
     def get_secrets(self):
-        secrets = self.content["data"]
+        if self._sorted_secrets is not None:
+            return self._sorted_secrets
 
-        def lowered(tup):
-            return [str(f).lower() for f in tup]
+        def sort_key(secret):
+            return tuple((str(k).lower(), str(v).lower()) for k, v in secret.items())
 
-        return sorted(secrets, key=lambda s: [lowered(t) for t in list(s.items())])
+        self._sorted_secrets = sorted(self.content["data"], key=sort_key)
+        return self._sorted_secrets
 
 
     def get_secret_by_id(self, secret_id):
@@ -96,6 +140,7 @@ class Store:
 
     def clear_secrets(self):
         self.content["data"] = []
+        self._sorted_secrets = None
 
     def _modify_secret(self, secret, secret_mod, update_date_field=None):
         for f in self.get_fields():
@@ -110,6 +155,7 @@ class Store:
         new_secret = {}
         self._modify_secret(new_secret, secret, update_date_field=FIELD_ADDED)
         self.content["data"].append(new_secret)
+        self._sorted_secrets = None
         return True
 
     def modify_secret(self, secret_id, secret_mod):
@@ -119,17 +165,21 @@ class Store:
             return False
 
         self._modify_secret(secret, secret_mod, update_date_field=FIELD_MODIFIED)
+        self._sorted_secrets = None
         return True
 
 
     def remove_secret(self, secret_id):
+        return secret_id in self.remove_secrets([secret_id])
+
+    def remove_secrets(self, secret_ids):
         secrets = self.get_secrets()
+        removed_ids = {i for i in secret_ids if 0 <= i < len(secrets)}
 
-        if 0 <= secret_id < len(secrets):
-            secret_ro_remove = secrets[secret_id]
-            try:
-                self.content["data"].remove(secret_ro_remove)
-                return True
-            except ValueError:
-                return False
-        return False
+        if removed_ids:
+            # Filter in a single pass, IDs refer to the sorted secrets
+            removed = {id(secrets[i]) for i in removed_ids}
+            self.content["data"] = [s for s in self.content["data"] if id(s) not in removed]
+            self._sorted_secrets = None
+
+        return removed_ids
@@ -1,4 +1,5 @@
 import random
+import secrets
 import string
 import tempfile
 import unittest
@@ -10,7 +11,9 @@ from secrets_guard.aes import aes_encrypt_file, aes_decrypt_file, aes_encrypt, a
 
 
 def random_string(length=10, alphabet=string.ascii_lowercase):
-    return ''.join(random.choice(alphabet) for _ in range(length))
+    # Map each random byte to a character of the (ASCII) alphabet at once
+    table = bytes(ord(alphabet[i % len(alphabet)]) for i in range(256))
+    return secrets.token_bytes(length).translate(table).decode("ascii")
 
 class AesTests(unittest.TestCase):
 
@@ -0,0 +1,71 @@
+import io
+import json
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from unittest.mock import patch
+
+from secrets_guard.__main__ import keyval_list_to_dict, main
+from secrets_guard.keyring import keyring_del_key
+
+
+class KeyvalListToDictTests(unittest.TestCase):
+
+    def test_split_on_first_equal(self):
+        self.assertEqual(keyval_list_to_dict(["x=y=z"]), {"x": "y=z"})
+
+    def test_skip_without_equal(self):
+        self.assertEqual(keyval_list_to_dict(["a=1", "junk", "b="]), {"a": "1", "b": ""})
+
+    def test_empty_key(self):
+        self.assertEqual(keyval_list_to_dict(["=v"]), {"": "v"})
+
+
+class MainTests(unittest.TestCase):
+
+    STORE_NAME = "secrets_guard_main_tests"
+    STORE_KEY = "key"
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        keyring_del_key(MainTests.STORE_NAME)
+
+    def tearDown(self):
+        keyring_del_key(MainTests.STORE_NAME)
+        self.tmpdir.cleanup()
+
+    def secrets(self, *args):
+        argv = ["secrets", *args, MainTests.STORE_NAME,
+                "-k", MainTests.STORE_KEY, "-p", self.tmpdir.name]
+        out = io.StringIO()
+        with patch("sys.argv", argv), redirect_stdout(out):
+            main()
+        return out.getvalue()
+
+    def test_add_modify_with_data(self):
+        self.secrets("create", "-f", "Site+m", "-f", "Password+h")
+        self.secrets("add", "-d", "Site=github", "-d", "Password=a=b")
+        self.secrets("add", "-d", "Site=amazon", "-d", "Password=pw")
+
+        secrets = json.loads(self.secrets("show", "-j"))
+        self.assertEqual(
+            [(s["ID"], s["Site"], s["Password"]) for s in secrets],
+            [(0, "amazon", "pw"), (1, "github", "a=b")]
+        )
+
+        # modify takes the secret ID as positional after the store name
+        argv = ["secrets", "modify", MainTests.STORE_NAME, "1",
+                "-k", MainTests.STORE_KEY, "-p", self.tmpdir.name,
+                "-d", "Password=new"]
+        with patch("sys.argv", argv):
+            main()
+
+        secrets = json.loads(self.secrets("show", "-j"))
+        self.assertEqual(
+            [(s["ID"], s["Site"], s["Password"]) for s in secrets],
+            [(0, "amazon", "pw"), (1, "github", "new")]
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,80 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+from secrets_guard.store import Store
+
+
+class StoreTests(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.store = Store(Path(self.tmpdir.name) / "test.sec", "key")
+        self.store.add_field("Name")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def names(self):
+        return [s["Name"] for s in self.store.get_secrets()]
+
+    def test_remove_secrets(self):
+        for name in ["a", "b", "c", "d", "e"]:
+            self.store.add_secret({"Name": name})
+
+        removed = self.store.remove_secrets([1, 3])
+
+        self.assertEqual(removed, {1, 3})
+        self.assertEqual(self.names(), ["a", "c", "e"])
+
+    def test_remove_one_of_identical_secrets(self):
+        first = {"Name": "x"}
+        second = {"Name": "x"}
+        other = {"Name": "y"}
+        self.store.content["data"] = [first, second, other]
+
+        removed = self.store.remove_secrets([1])
+
+        self.assertEqual(removed, {1})
+        self.assertEqual(len(self.store.content["data"]), 2)
+        self.assertIs(self.store.content["data"][0], first)
+        self.assertIs(self.store.content["data"][1], other)
+
+    def test_remove_invalid_secrets(self):
+        for name in ["a", "b"]:
+            self.store.add_secret({"Name": name})
+
+        removed = self.store.remove_secrets([-1, 1, 1, 2, 10])
+
+        self.assertEqual(removed, {1})
+        self.assertEqual(self.names(), ["a"])
+
+        self.assertEqual(self.store.remove_secrets([5]), set())
+        self.assertEqual(self.names(), ["a"])
+
+    def test_remove_secrets_invalidates_sorted_secrets(self):
+        for name in ["c", "a", "b"]:
+            self.store.add_secret({"Name": name})
+
+        self.assertEqual(self.names(), ["a", "b", "c"])
+        self.assertIsNotNone(self.store._sorted_secrets)
+
+        self.store.remove_secrets([0])
+
+        self.assertIsNone(self.store._sorted_secrets)
+        self.assertEqual(self.names(), ["b", "c"])
+        self.assertEqual(self.store.get_secret_by_id(0)["Name"], "b")
+
+    def test_remove_secrets_persisted(self):
+        for name in ["a", "b", "c"]:
+            self.store.add_secret({"Name": name})
+        self.store.remove_secrets([0, 2])
+        self.assertTrue(self.store.save())
+
+        store = Store(self.store.path, "key")
+        self.assertTrue(store.load())
+        self.assertEqual([s["Name"] for s in store.get_secrets()], ["b"])
+
+
+if __name__ == "__main__":
+    unittest.main()